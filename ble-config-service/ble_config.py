@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 import configparser
+import contextlib
+import functools
 import grp
 import importlib.util
 import json
 import logging
+import mmap
 import os
 import pwd
 import re
@@ -11,9 +14,16 @@ import shutil
 import subprocess
 import tempfile
 import time
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from bluezero import adapter, peripheral
+from gi.repository import GLib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 SERVICE_UUID = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
 RX_UUID = "6e400002-b5a3-f393-e0a9-e50e24dcca9e"
@@ -24,6 +34,15 @@ CONFIG_PATH = "/home/pi/zero-stock-screen/configuration.cfg"
 SCREEN_SERVICE = "stock-screen.service"
 CONFIG_OWNER_USER = "pi"
 CONFIG_OWNER_GROUP = "pi"
+READ_CACHE_TTL_SECONDS = 2.0
+WRITE_DEBOUNCE_SECONDS = 0.5
+WIFI_CACHE_TTL_SECONDS = 10.0
+
+_SECTION_RE = re.compile(r"^[ \t]*\[(.+?)\][ \t\r]*$", re.MULTILINE)
+_SUPPLICANT_BLOCK_RE = re.compile(rb"^[ \t]*network=\{(.*?)^[ \t]*\}", re.MULTILINE | re.DOTALL)
+_SUPPLICANT_SSID_RE = re.compile(rb'^[ \t]*ssid[ \t]*=[ \t]*"(.+)"', re.MULTILINE)
+_SUPPLICANT_PSK_RE = re.compile(rb'^[ \t]*#?psk[ \t]*=[ \t]*"(.+)"', re.MULTILINE)
+_SUPPLICANT_NETWORK_RE = re.compile(r"network=\{[^\}]*\}\s*", re.MULTILINE)
 
 
 def _resolve_owner_ids(user: str, group: Optional[str]) -> Optional[Tuple[int, int]]:
@@ -42,230 +61,307 @@ def _resolve_owner_ids(user: str, group: Optional[str]) -> Optional[Tuple[int, i
         gid = pwd.getpwnam(user).pw_gid
     return uid, gid
 
-def _read_lines(path: str) -> List[str]:
-    with open(path, "r", encoding="utf-8") as handle:
-        return handle.readlines()
-
-
-def _section_ranges(lines: List[str]) -> Dict[str, Tuple[int, int]]:
-    sections: Dict[str, Tuple[int, int]] = {}
-    current: Optional[str] = None
-    start_index: Optional[int] = None
-    for idx, line in enumerate(lines):
-        match = re.match(r"\s*\[(.+?)\]\s*$", line)
-        if match:
-            if current is not None and start_index is not None:
-                sections[current] = (start_index, idx)
-            current = match.group(1).strip()
-            start_index = idx
-    if current is not None and start_index is not None:
-        sections[current] = (start_index, len(lines))
-    return sections
-
-
-def _ensure_section(lines: List[str], section: str) -> None:
-    ranges = _section_ranges(lines)
-    if section in ranges:
-        return
-    if lines and not lines[-1].endswith("\n"):
-        lines[-1] = f"{lines[-1]}\n"
-    if lines and lines[-1].strip():
-        lines.append("\n")
-    lines.append(f"[{section}]\n")
+@contextlib.contextmanager
+def _mmap_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    with open(path, "rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, prot=mmap.PROT_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            mapped = None
+        if mapped is None:
+            yield handle.read()
+            return
+        with mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
 
 
-def _find_key(lines: List[str], section: str, key: str) -> Optional[Tuple[int, re.Match]]:
-    ranges = _section_ranges(lines)
-    if section not in ranges:
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as handle:
+        return handle.read()
+
+
+def _iter_sections(text: str) -> Iterator[Tuple[str, int, int]]:
+    # Yields (name, body_start, body_end) for each section, where the body
+    # runs from the line after the header up to the next header. A section
+    # is yielded as soon as the next header is found, so callers can stop
+    # scanning early.
+    previous: Optional[re.Match] = None
+    for match in _SECTION_RE.finditer(text):
+        if previous is not None:
+            yield previous.group(1).strip(), min(previous.end() + 1, len(text)), match.start()
+        previous = match
+    if previous is not None:
+        yield previous.group(1).strip(), min(previous.end() + 1, len(text)), len(text)
+
+
+def _section_spans(text: str, sections: Tuple[str, ...]) -> Dict[str, Tuple[int, int]]:
+    wanted = set(sections)
+    spans: Dict[str, Tuple[int, int]] = {}
+    for name, start, end in _iter_sections(text):
+        if name in wanted:
+            spans[name] = (start, end)
+            wanted.discard(name)
+            if not wanted:
+                break
+    return spans
+
+
+def _append_section(text: str, section: str) -> str:
+    if text and not text.endswith("\n"):
+        text = f"{text}\n"
+    if text and text[text.rfind("\n", 0, len(text) - 1) + 1:].strip():
+        text = f"{text}\n"
+    return f"{text}[{section}]\n"
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_key_pattern(key: str) -> re.Pattern:
+    return re.compile(rf"^([ \t]*{re.escape(key)}[ \t]*[:=][ \t]*)([^#;\n]*)([ \t]*(#.*)?)$", re.MULTILINE)
+
+
+def _set_key(body: str, key: str, value: str) -> str:
+    match = _compile_key_pattern(key).search(body)
+    if match:
+        return f"{body[:match.start(2)]}{value}{body[match.end(2):]}"
+
+    # Insert after the last non-blank line of the section.
+    content_end = len(body.rstrip())
+    if content_end == 0:
+        insert_at = 0
+    else:
+        newline_at = body.find("\n", content_end)
+        if newline_at == -1:
+            body = f"{body}\n"
+            insert_at = len(body)
+        else:
+            insert_at = newline_at + 1
+    return f"{body[:insert_at]}{key} : {value}\n{body[insert_at:]}"
+
+
+def _apply_section_updates(text: str, section: str, values: List[Tuple[str, str]]) -> str:
+    span = _section_spans(text, (section,)).get(section)
+    if span is None:
+        text = _append_section(text, section)
+        span = (len(text), len(text))
+    start, end = span
+    body = text[start:end]
+    for key, value in values:
+        body = _set_key(body, key, value)
+    return f"{text[:start]}{body}{text[end:]}"
+
+
+def _get_value(text: str, span: Optional[Tuple[int, int]], key: str) -> Optional[str]:
+    if span is None:
         return None
-    start, end = ranges[section]
-    pattern = re.compile(rf"^(\s*{re.escape(key)}\s*[:=]\s*)([^#;\n]*)(\s*(#.*)?)$")
-    for idx in range(start + 1, end):
-        line = lines[idx]
-        match = pattern.match(line.rstrip("\n"))
-        if match:
-            return idx, match
-    return None
-
-
-def _set_key(lines: List[str], section: str, key: str, value: str) -> None:
-    _ensure_section(lines, section)
-    found = _find_key(lines, section, key)
-    if found:
-        idx, match = found
-        newline = "\n" if lines[idx].endswith("\n") else ""
-        lines[idx] = f"{match.group(1)}{value}{match.group(3)}{newline}"
-        return
-
-    ranges = _section_ranges(lines)
-    start, end = ranges[section]
-    insert_at = start + 1
-    for idx in range(end - 1, start, -1):
-        if lines[idx].strip():
-            insert_at = idx + 1
-            break
-    lines.insert(insert_at, f"{key} : {value}\n")
-
-
-def _get_value(lines: List[str], section: str, key: str) -> Optional[str]:
-    found = _find_key(lines, section, key)
-    if not found:
+    match = _compile_key_pattern(key).search(text, span[0], span[1])
+    if not match:
         return None
-    _, match = found
     return match.group(2).strip()
 
 
-def _load_config_values(path: str) -> Dict[str, Dict[str, object]]:
-    lines = []
+def _load_config_values(path: str, wifi: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, object]]:
+    text = ""
     if os.path.exists(path):
-        lines = _read_lines(path)
+        text = _read_text(path)
+    spans = _section_spans(text, ("base", "epd2in13v3"))
+    base_span = spans.get("base")
+    epd_span = spans.get("epd2in13v3")
     result: Dict[str, Dict[str, object]] = {}
     base: Dict[str, object] = {}
-    refresh = _get_value(lines, "base", "refresh_interval_minutes")
+    refresh = _get_value(text, base_span, "refresh_interval_minutes")
     if refresh is not None:
         try:
             base["refresh_interval_minutes"] = int(refresh)
         except ValueError:
             base["refresh_interval_minutes"] = refresh
-    data_range = _get_value(lines, "base", "data_range_days")
+    data_range = _get_value(text, base_span, "data_range_days")
     if data_range is not None:
         try:
             base["data_range_days"] = float(data_range)
         except ValueError:
             base["data_range_days"] = data_range
-    base_url = _get_value(lines, "base", "data_api_base_url")
+    base_url = _get_value(text, base_span, "data_api_base_url")
     if base_url is not None:
         base["data_api_base_url"] = base_url
-    ticker = _get_value(lines, "base", "ticker")
+    ticker = _get_value(text, base_span, "ticker")
     if ticker is not None:
         base["ticker"] = ticker
     if base:
         result["base"] = base
 
     epd: Dict[str, object] = {}
-    mode = _get_value(lines, "epd2in13v3", "mode")
+    mode = _get_value(text, epd_span, "mode")
     if mode is not None:
         epd["mode"] = mode
     if epd:
         result["epd2in13v3"] = epd
-    wifi = _load_wifi_details()
+    if wifi is None:
+        wifi = _load_wifi_details()
     if wifi:
         result["wifi"] = wifi
     return result
 
 
 def _write_config(path: str, updates: Dict[str, Dict[str, object]]) -> None:
-    existing_stat: Optional[os.stat_result] = None
-    if os.path.exists(path):
+    config_dir = os.path.dirname(path)
+    existing_stat: Optional[os.stat_result]
+    try:
         existing_stat = os.stat(path)
-
-    lines = []
-    if os.path.exists(path):
-        lines = _read_lines(path)
-
-    if "base" in updates:
-        base_updates = updates["base"]
-        if "refresh_interval_minutes" in base_updates:
-            _set_key(lines, "base", "refresh_interval_minutes", str(base_updates["refresh_interval_minutes"]))
-        if "data_range_days" in base_updates:
-            _set_key(lines, "base", "data_range_days", str(base_updates["data_range_days"]))
-        if "data_api_base_url" in base_updates:
-            _set_key(lines, "base", "data_api_base_url", str(base_updates["data_api_base_url"]))
-        if "ticker" in base_updates:
-            _set_key(lines, "base", "ticker", str(base_updates["ticker"]))
-
-    if "epd2in13v3" in updates:
-        epd_updates = updates["epd2in13v3"]
-        if "mode" in epd_updates:
-            _set_key(lines, "epd2in13v3", "mode", str(epd_updates["mode"]))
-
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    temp_handle = tempfile.NamedTemporaryFile("w", delete=False, dir=os.path.dirname(path), encoding="utf-8")
+        text = _read_text(path)
+    except FileNotFoundError:
+        existing_stat = None
+        text = ""
+    config_exists = existing_stat is not None
+    for section, validators in _SECTION_VALIDATORS:
+        section_updates = updates.get(section, {})
+        values = [(key, str(section_updates[key])) for key, _validate in validators if key in section_updates]
+        if values:
+            text = _apply_section_updates(text, section, values)
+
+    os.makedirs(config_dir, exist_ok=True)
+    temp_handle = tempfile.NamedTemporaryFile("w", delete=False, dir=config_dir, encoding="utf-8")
     try:
-        temp_handle.writelines(lines)
+        temp_handle.write(text)
         temp_handle.flush()
-        os.fsync(temp_handle.fileno())
+        # The data is what matters here; the rename below is made durable by
+        # syncing the directory instead of the file's metadata.
+        if hasattr(os, "fdatasync"):
+            os.fdatasync(temp_handle.fileno())
+        else:
+            os.fsync(temp_handle.fileno())
     finally:
         temp_handle.close()
 
-    if os.path.exists(path):
-        shutil.copy2(path, f"{path}.bak")
-    os.replace(temp_handle.name, path)
     if existing_stat is None:
         try:
-            existing_stat = os.stat(os.path.dirname(path))
+            existing_stat = os.stat(config_dir)
         except OSError:
             existing_stat = None
+    # Apply ownership and mode to the temp file so the replaced config never
+    # shows up with the temp file's 0600 permissions.
     owner_ids = _resolve_owner_ids(CONFIG_OWNER_USER, CONFIG_OWNER_GROUP)
     target_ids = owner_ids
     if target_ids is None and existing_stat is not None:
         target_ids = (existing_stat.st_uid, existing_stat.st_gid)
     if target_ids is not None:
         try:
-            os.chown(path, target_ids[0], target_ids[1])
+            os.chown(temp_handle.name, target_ids[0], target_ids[1])
             if existing_stat is not None:
-                os.chmod(path, existing_stat.st_mode)
+                os.chmod(temp_handle.name, existing_stat.st_mode)
         except OSError:
             pass
 
+    if config_exists:
+        _backup_config(path)
+    os.replace(temp_handle.name, path)
+    # The new config is already in place; a failed directory sync only puts
+    # the rename's durability at risk, so it must not report a failed write.
+    try:
+        _fsync_directory(config_dir)
+    except OSError as exc:
+        logging.warning("Failed to sync config directory %s: %s", config_dir, exc)
+
+
+def _fsync_directory(path: str) -> None:
+    dir_fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _backup_config(path: str) -> None:
+    # Hard-link the current file as the backup instead of copying it; the
+    # following os.replace leaves that inode untouched.
+    backup_path = f"{path}.bak"
+    try:
+        os.unlink(backup_path)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, backup_path)
+    except FileNotFoundError:
+        return
+    except OSError:
+        shutil.copy2(path, backup_path)
+
+
+def _validate_int_range(low: int, high: int) -> Callable[[str, object], int]:
+    def validate(name: str, value: object) -> int:
+        if not isinstance(value, int):
+            raise ValueError(f"{name} must be int")
+        if value < low or value > high:
+            raise ValueError(f"{name} out of range")
+        return value
+
+    return validate
+
+
+def _validate_float_range(low: float, high: float) -> Callable[[str, object], float]:
+    def validate(name: str, value: object) -> float:
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be number")
+        value_float = float(value)
+        if value_float < low or value_float > high:
+            raise ValueError(f"{name} out of range")
+        return value_float
+
+    return validate
+
+
+def _validate_nonempty_str(name: str, value: object) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be string")
+    trimmed = value.strip()
+    if not trimmed:
+        raise ValueError(f"{name} cannot be empty")
+    return trimmed
+
+
+def _validate_choice(choices: Tuple[str, ...]) -> Callable[[str, object], str]:
+    def validate(name: str, value: object) -> str:
+        if not isinstance(value, str):
+            raise ValueError(f"{name} must be string")
+        trimmed = value.strip().lower()
+        if trimmed not in choices:
+            raise ValueError(f"{name} must be {' or '.join(choices)}")
+        return trimmed
+
+    return validate
+
+
+# Keys the BLE service may write, per section, in the order they are applied.
+_SECTION_VALIDATORS = (
+    (
+        "base",
+        (
+            ("refresh_interval_minutes", _validate_int_range(1, 1440)),
+            ("data_range_days", _validate_float_range(0.1, 365.0)),
+            ("data_api_base_url", _validate_nonempty_str),
+            ("ticker", _validate_nonempty_str),
+        ),
+    ),
+    ("epd2in13v3", (("mode", _validate_choice(("candle", "line"))),)),
+)
+
 
 def _validate_updates(payload: Dict[str, object]) -> Dict[str, Dict[str, object]]:
     updates: Dict[str, Dict[str, object]] = {}
-    if "base" in payload:
-        base_payload = payload["base"]
-        if not isinstance(base_payload, dict):
-            raise ValueError("base must be an object")
-        base_updates: Dict[str, object] = {}
-        if "refresh_interval_minutes" in base_payload:
-            value = base_payload["refresh_interval_minutes"]
-            if not isinstance(value, int):
-                raise ValueError("refresh_interval_minutes must be int")
-            if value < 1 or value > 1440:
-                raise ValueError("refresh_interval_minutes out of range")
-            base_updates["refresh_interval_minutes"] = value
-        if "data_range_days" in base_payload:
-            value = base_payload["data_range_days"]
-            if not isinstance(value, (int, float)):
-                raise ValueError("data_range_days must be number")
-            value_float = float(value)
-            if value_float < 0.1 or value_float > 365.0:
-                raise ValueError("data_range_days out of range")
-            base_updates["data_range_days"] = value_float
-        if "data_api_base_url" in base_payload:
-            value = base_payload["data_api_base_url"]
-            if not isinstance(value, str):
-                raise ValueError("data_api_base_url must be string")
-            trimmed = value.strip()
-            if not trimmed:
-                raise ValueError("data_api_base_url cannot be empty")
-            base_updates["data_api_base_url"] = trimmed
-        if "ticker" in base_payload:
-            value = base_payload["ticker"]
-            if not isinstance(value, str):
-                raise ValueError("ticker must be string")
-            trimmed = value.strip()
-            if not trimmed:
-                raise ValueError("ticker cannot be empty")
-            base_updates["ticker"] = trimmed
-        if base_updates:
-            updates["base"] = base_updates
-
-    if "epd2in13v3" in payload:
-        epd_payload = payload["epd2in13v3"]
-        if not isinstance(epd_payload, dict):
-            raise ValueError("epd2in13v3 must be an object")
-        epd_updates: Dict[str, object] = {}
-        if "mode" in epd_payload:
-            value = epd_payload["mode"]
-            if not isinstance(value, str):
-                raise ValueError("mode must be string")
-            trimmed = value.strip().lower()
-            if trimmed not in {"candle", "line"}:
-                raise ValueError("mode must be candle or line")
-            epd_updates["mode"] = trimmed
-        if epd_updates:
-            updates["epd2in13v3"] = epd_updates
-
+    for section, validators in _SECTION_VALIDATORS:
+        if section not in payload:
+            continue
+        section_payload = payload[section]
+        if not isinstance(section_payload, dict):
+            raise ValueError(f"{section} must be an object")
+        section_updates: Dict[str, object] = {}
+        for key, validate in validators:
+            if key in section_payload:
+                section_updates[key] = validate(key, section_payload[key])
+        if section_updates:
+            updates[section] = section_updates
     return updates
 
 
@@ -287,32 +383,65 @@ def _run_command(command: List[str], *, input_text: Optional[str] = None) -> Tup
     return True, result.stdout.strip()
 
 
-def _get_active_wifi_connection() -> Tuple[Optional[str], Optional[str]]:
+@dataclass
+class _NmcliSnapshot:
+    connection_name: Optional[str] = None
+    device: Optional[str] = None
+    state: Optional[str] = None
+    in_use: bool = False
+    ssid: Optional[str] = None
+    signal: Optional[str] = None
+
+
+def _nmcli_unescape(field: str) -> str:
+    return field.replace("\\:", ":").replace("\\\\", "\\")
+
+
+def _nmcli_snapshot() -> _NmcliSnapshot:
+    snapshot = _NmcliSnapshot()
     if not shutil.which("nmcli"):
+        return snapshot
+
+    success, output = _run_command(["nmcli", "-t", "-f", "DEVICE,TYPE,STATE,CONNECTION", "dev", "status"])
+    if success:
+        for line in output.splitlines():
+            parts = line.split(":", 3)
+            if len(parts) != 4:
+                continue
+            device, device_type, state, connection_name = parts
+            if device_type != "wifi":
+                continue
+            snapshot.device = device
+            snapshot.state = state
+            if connection_name and connection_name != "--":
+                snapshot.connection_name = _nmcli_unescape(connection_name)
+            break
+
+    success, output = _run_command(["nmcli", "-t", "-f", "IN-USE,SSID,SIGNAL", "dev", "wifi", "list", "--rescan", "no"])
+    if success:
+        for line in output.splitlines():
+            parts = line.split(":", 1)
+            if len(parts) != 2 or parts[0] != "*":
+                continue
+            ssid, _sep, signal = parts[1].rpartition(":")
+            snapshot.in_use = True
+            snapshot.ssid = _nmcli_unescape(ssid).strip() or None
+            snapshot.signal = signal.strip() or None
+            break
+    return snapshot
+
+
+def _get_active_wifi_connection(snapshot: Optional[_NmcliSnapshot] = None) -> Tuple[Optional[str], Optional[str]]:
+    snapshot = snapshot or _nmcli_snapshot()
+    if not snapshot.connection_name:
         return None, None
-    success, output = _run_command(["nmcli", "-t", "-f", "NAME,TYPE,DEVICE", "connection", "show", "--active"])
-    if not success:
-        return None, None
-    for line in output.splitlines():
-        if not line.strip():
-            continue
-        try:
-            name, connection_type, device = line.rsplit(":", 2)
-        except ValueError:
-            continue
-        if connection_type == "wifi":
-            return name, device
-    return None, None
+    return snapshot.connection_name, snapshot.device
 
 
-def _get_active_ssid() -> Optional[str]:
-    if shutil.which("nmcli"):
-        success, output = _run_command(["nmcli", "-t", "-f", "ACTIVE,SSID", "dev", "wifi"])
-        if success:
-            for line in output.splitlines():
-                if line.startswith("yes:"):
-                    ssid = line.split(":", 1)[1].strip()
-                    return ssid or None
+def _get_active_ssid(snapshot: Optional[_NmcliSnapshot] = None) -> Optional[str]:
+    snapshot = snapshot or _nmcli_snapshot()
+    if snapshot.in_use:
+        return snapshot.ssid
     if shutil.which("iwgetid"):
         success, output = _run_command(["iwgetid", "-r"])
         if success:
@@ -345,38 +474,17 @@ def _get_active_psk(connection_name: Optional[str], ssid: Optional[str]) -> Opti
     if not os.path.exists(supplicant_path):
         return None
     try:
-        with open(supplicant_path, "r", encoding="utf-8") as handle:
-            lines = handle.readlines()
+        with _mmap_file(supplicant_path) as content:
+            for block in _SUPPLICANT_BLOCK_RE.finditer(content):
+                body = block.group(1)
+                ssid_matches = _SUPPLICANT_SSID_RE.findall(body)
+                psk_matches = _SUPPLICANT_PSK_RE.findall(body)
+                if not ssid_matches or not psk_matches:
+                    continue
+                if ssid_matches[-1].decode("utf-8", errors="replace") == ssid:
+                    return psk_matches[-1].decode("utf-8", errors="replace")
     except OSError:
         return None
-
-    in_network = False
-    current_ssid = None
-    current_psk = None
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("network={"):
-            in_network = True
-            current_ssid = None
-            current_psk = None
-            continue
-        if in_network and stripped.startswith("}"):
-            if current_ssid == ssid and current_psk:
-                return current_psk
-            in_network = False
-            current_ssid = None
-            current_psk = None
-            continue
-        if not in_network:
-            continue
-        ssid_match = re.match(r'ssid\s*=\s*"(.+)"', stripped)
-        if ssid_match:
-            current_ssid = ssid_match.group(1)
-            continue
-        psk_match = re.match(r'#?psk\s*=\s*"(.+)"', stripped)
-        if psk_match:
-            current_psk = psk_match.group(1)
-            continue
     return None
 
 
@@ -480,52 +588,31 @@ def _get_nmconnection_psk(connection_name: Optional[str], ssid: Optional[str]) -
     return None
 
 
-def _get_wifi_status() -> Optional[str]:
+def _get_wifi_status(snapshot: Optional[_NmcliSnapshot] = None) -> Optional[str]:
     if not shutil.which("nmcli"):
         return "Unknown"
-    success, output = _run_command(["nmcli", "-t", "-f", "IN-USE,SSID,SIGNAL", "dev", "wifi"])
-    if success:
-        for line in output.splitlines():
-            if not line.strip():
-                continue
-            parts = line.split(":", 2)
-            if len(parts) != 3:
-                continue
-            in_use, ssid, signal = parts
-            if in_use != "*":
-                continue
-            readable_ssid = ssid.strip()
-            signal_value = signal.strip()
-            if signal_value.isdigit():
-                if readable_ssid:
-                    return f"Connected to {readable_ssid} (signal {signal_value}%)"
-                return f"Connected (signal {signal_value}%)"
+    snapshot = snapshot or _nmcli_snapshot()
+    if snapshot.in_use:
+        readable_ssid = snapshot.ssid
+        signal_value = snapshot.signal or ""
+        if signal_value.isdigit():
             if readable_ssid:
-                return f"Connected to {readable_ssid}"
+                return f"Connected to {readable_ssid} (signal {signal_value}%)"
+            return f"Connected (signal {signal_value}%)"
+        if readable_ssid:
+            return f"Connected to {readable_ssid}"
+        return "Connected"
+    state = snapshot.state
+    if state:
+        if state == "connected":
             return "Connected"
-    success, output = _run_command(["nmcli", "-t", "-f", "DEVICE,STATE,TYPE", "dev", "status"])
-    if success:
-        for line in output.splitlines():
-            if not line.strip():
-                continue
-            parts = line.split(":", 2)
-            if len(parts) != 3:
-                continue
-            _device, state, device_type = parts
-            if device_type == "wifi":
-                if state == "connected":
-                    return "Connected"
-                if state == "disconnected":
-                    return "Disconnected"
-                return state.replace("-", " ").title()
+        if state == "disconnected":
+            return "Disconnected"
+        return state.replace("-", " ").title()
     return "Unknown"
 
 
-def _load_wifi_details() -> Dict[str, str]:
-    connection_name, _device = _get_active_wifi_connection()
-    ssid = _get_active_ssid()
-    psk = _get_active_psk(connection_name, ssid)
-    status = _get_wifi_status()
+def _wifi_details(ssid: Optional[str], psk: Optional[str], status: Optional[str]) -> Dict[str, str]:
     wifi: Dict[str, str] = {}
     if ssid:
         wifi["ssid"] = ssid
@@ -536,6 +623,14 @@ def _load_wifi_details() -> Dict[str, str]:
     return wifi
 
 
+def _load_wifi_details(snapshot: Optional[_NmcliSnapshot] = None) -> Dict[str, str]:
+    snapshot = snapshot or _nmcli_snapshot()
+    connection_name, _device = _get_active_wifi_connection(snapshot)
+    ssid = _get_active_ssid(snapshot)
+    psk = _get_active_psk(connection_name, ssid)
+    return _wifi_details(ssid, psk, _get_wifi_status(snapshot))
+
+
 def _provision_wifi(ssid: str, psk: str) -> Tuple[bool, str]:
     if shutil.which("nmcli"):
         active_connection, _device = _get_active_wifi_connection()
@@ -583,12 +678,10 @@ def _provision_wifi(ssid: str, psk: str) -> Tuple[bool, str]:
             existing = handle.read()
 
     network_block = output.strip()
-    ssid_pattern = re.escape(f'ssid="{ssid}"')
-    existing = re.sub(
-        rf"network=\{{[^\}}]*{ssid_pattern}[^\}}]*\}}\s*",
-        "",
+    ssid_marker = f'ssid="{ssid}"'
+    existing = _SUPPLICANT_NETWORK_RE.sub(
+        lambda match: "" if ssid_marker in match.group(0) else match.group(0),
         existing,
-        flags=re.MULTILINE,
     )
     if existing and not existing.endswith("\n"):
         existing += "\n"
@@ -607,18 +700,38 @@ def _restart_screen_service() -> Tuple[bool, str]:
     return _run_command(["systemctl", "restart", SCREEN_SERVICE])
 
 
-def _decode_value(value: List[int]) -> str:
+def _encode_json(data: Dict[str, Dict[str, object]]) -> bytes:
+    # Compact separators and raw UTF-8 (orjson's only output, and shorter than
+    # \u escapes for non-ASCII SSIDs) keep the payload to as few BLE packets as
+    # possible.
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _decode_value(value: Union[bytes, bytearray, List[int]]) -> str:
+    # dbus hands over a list of Byte ints; anything already bytes-like is
+    # decoded in place rather than copied first.
     if isinstance(value, (bytes, bytearray)):
-        return bytes(value).decode("utf-8")
+        return value.decode("utf-8")
     return bytes(value).decode("utf-8")
 
 
-def _encode_value(text: str) -> List[int]:
-    return list(text.encode("utf-8"))
+def _encode_value(text: str) -> bytearray:
+    return bytearray(text.encode("utf-8"))
 
 
 class BleConfigServer:
     def __init__(self) -> None:
+        self._read_cache: Optional[Tuple[float, Optional[int], bytes]] = None
+        self._pending_updates: Dict[str, Dict[str, object]] = {}
+        self._flush_source: Optional[int] = None
+        self._ack_pending = False
+        self._wifi_cache: Dict[str, str] = {}
+        self._wifi_checked_at = 0.0
+        self._wifi_refresh_source: Optional[int] = None
+        self._wifi_psk_source: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._wifi_psk: Optional[str] = None
         adapters = list(adapter.Adapter.available())
         if not adapters:
             raise RuntimeError("No Bluetooth adapters found")
@@ -656,6 +769,8 @@ class BleConfigServer:
             flags=["read"],
             read_callback=self._on_read,
         )
+        self._refresh_wifi_cache(refresh_psk=True)
+
     @staticmethod
     def _resolve_adapter_address(adapter_entry):
         if isinstance(adapter_entry, str):
@@ -692,7 +807,7 @@ class BleConfigServer:
         self.tx_characteristic.value = _encode_value(message)
         self.peripheral.notify(1, 2)
 
-    def _on_read(self, *args) -> List[int]:
+    def _on_read(self, *args) -> bytearray:
         offset = 0
         if args:
             candidate = args[0]
@@ -700,12 +815,89 @@ class BleConfigServer:
                 offset = candidate
             elif isinstance(candidate, dict) and "offset" in candidate:
                 offset = int(candidate["offset"])
-        data = _load_config_values(CONFIG_PATH)
-        payload = json.dumps(data, ensure_ascii=False)
-        encoded = _encode_value(payload)
+        self._flush_config_writes()
+        encoded = self._read_payload()
         if offset <= 0:
-            return encoded
-        return encoded[offset:]
+            return bytearray(encoded)
+        return bytearray(memoryview(encoded)[offset:])
+
+    def _read_payload(self) -> bytes:
+        # Long reads arrive as a series of offset reads, so reuse the payload
+        # for a short while unless the config file changed underneath it.
+        try:
+            mtime_ns: Optional[int] = os.stat(CONFIG_PATH).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        now = time.monotonic()
+        if self._read_cache is not None:
+            cached_at, cached_mtime_ns, cached_payload = self._read_cache
+            if now - cached_at < READ_CACHE_TTL_SECONDS and cached_mtime_ns == mtime_ns:
+                return cached_payload
+        # nmcli is slow, so a stale wifi snapshot is served as is and re-queried
+        # from the main loop once this read has been answered.
+        if now - self._wifi_checked_at >= WIFI_CACHE_TTL_SECONDS and self._wifi_refresh_source is None:
+            self._wifi_refresh_source = GLib.idle_add(self._on_wifi_refresh_idle)
+        data = _load_config_values(CONFIG_PATH, self._wifi_cache)
+        payload = _encode_json(data)
+        self._read_cache = (now, mtime_ns, payload)
+        return payload
+
+    def _on_wifi_refresh_idle(self) -> bool:
+        self._wifi_refresh_source = None
+        self._refresh_wifi_cache()
+        return False
+
+    def _refresh_wifi_cache(self, refresh_psk: bool = False) -> None:
+        snapshot = _nmcli_snapshot()
+        connection_name, _device = _get_active_wifi_connection(snapshot)
+        ssid = _get_active_ssid(snapshot)
+        # The PSK lookup reads secrets and config files; only repeat it
+        # when the active network changed or after provisioning.
+        psk_source = (connection_name, ssid)
+        if refresh_psk or psk_source != self._wifi_psk_source:
+            self._wifi_psk = _get_active_psk(connection_name, ssid)
+            self._wifi_psk_source = psk_source
+        self._wifi_checked_at = time.monotonic()
+        # Leave the read payload alone: a refresh can land between the offset
+        # reads of one long read, and the payload expires on its own shortly.
+        self._wifi_cache = _wifi_details(ssid, self._wifi_psk, _get_wifi_status(snapshot))
+
+    def _queue_config_write(self, updates: Dict[str, Dict[str, object]]) -> None:
+        # Centrals often send several writes back to back; coalesce them so
+        # the SD card sees a single config write. The flush runs on the GLib
+        # main loop like every other GATT callback, and the write is only
+        # acknowledged once the config is on disk.
+        for section, values in updates.items():
+            self._pending_updates.setdefault(section, {}).update(values)
+        self._ack_pending = True
+        if self._flush_source is not None:
+            GLib.source_remove(self._flush_source)
+        self._flush_source = GLib.timeout_add(int(WRITE_DEBOUNCE_SECONDS * 1000), self._on_flush_timeout)
+
+    def _on_flush_timeout(self) -> bool:
+        self._flush_source = None
+        self._flush_config_writes()
+        return False
+
+    def _flush_config_writes(self, acknowledge: bool = True) -> bool:
+        if self._flush_source is not None:
+            GLib.source_remove(self._flush_source)
+            self._flush_source = None
+        updates = self._pending_updates
+        self._pending_updates = {}
+        ack_pending = self._ack_pending
+        self._ack_pending = False
+        if not updates:
+            return True
+        self._read_cache = None
+        try:
+            _write_config(CONFIG_PATH, updates)
+        except OSError as exc:
+            self._notify(f"error: failed to update config ({exc})")
+            return False
+        if acknowledge and ack_pending:
+            self._notify("ok")
+        return True
 
     def _on_write(self, value: List[int], *_args) -> None:
         try:
@@ -743,23 +935,27 @@ class BleConfigServer:
                 self._notify("error: wifi ssid cannot be empty")
                 return
             success, output = _provision_wifi(ssid_trimmed, psk)
+            self._refresh_wifi_cache(refresh_psk=success)
+            self._read_cache = None
             if not success:
                 logging.error("WiFi provisioning failed for ssid=%s: %s", ssid_trimmed, output)
                 self._notify(f"error: wifi provisioning failed ({output})")
                 return
 
         if updates:
-            try:
-                _write_config(CONFIG_PATH, updates)
-            except OSError as exc:
-                self._notify(f"error: failed to update config ({exc})")
-                return
+            self._queue_config_write(updates)
 
         if payload.get("restart") is True:
+            # The restart result acknowledges any queued writes as well
+            if not self._flush_config_writes(acknowledge=False):
+                return
             success, output = _restart_screen_service()
             if not success:
                 self._notify(f"error: restart failed ({output})")
                 return
+        elif updates:
+            # _flush_config_writes sends "ok" once the update is persisted
+            return
 
         self._notify("ok")
 
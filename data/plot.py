@@ -22,24 +22,36 @@ class Plot:
         draw.line(plot_data, fill=fill)
 
     @staticmethod
-    def y_axis_labels(prices, font, position_first=(0, 0), position_last=(0, 0), draw=None, fill=None, labels_number=3):
+    def y_axis_labels(prices, font, position_first=(0, 0), position_last=(0, 0), draw=None, fill=None, labels_number=3,
+                      glyphs=None):
+        if not prices:
+            return
+        Plot.y_axis_labels_minmax(min(prices), max(prices), font, position_first, position_last, draw, fill,
+                                  labels_number, glyphs)
+
+    @staticmethod
+    def y_axis_labels_minmax(min_price, max_price, font, position_first=(0, 0), position_last=(0, 0), draw=None,
+                             fill=None, labels_number=3, glyphs=None):
         def center_x(price):
             area_width = position_last[0] - position_first[0]
-            text_width = draw.textlength(price, font)
+            if glyphs is None:
+                text_width = draw.textlength(price, font)
+            else:
+                text_width = glyphs.textlength(price)
             if area_width >= text_width:
                 return position_first[0] + (area_width - text_width) / 2
             else:
                 return position_first[0]
 
-        if not prices:
-            return
-        max_price = max(prices)
-        min_price = min(prices)
         price_step = (max_price - min_price) / (labels_number - 1)
         y_step = (position_last[1] - position_first[1]) / (labels_number - 1)
         for i in range(0, labels_number):
             human_price = Plot.human_format(min_price + i * price_step, 5)
-            draw.text((center_x(human_price), position_last[1] - i * y_step), human_price, font=font, fill=fill)
+            label_position = (center_x(human_price), position_last[1] - i * y_step)
+            if glyphs is None:
+                draw.text(label_position, human_price, font=font, fill=fill)
+            else:
+                glyphs.text(draw, label_position, human_price, fill=fill)
 
     @staticmethod
     def percentage(prices, x_middle, y, font, draw, fill=None):
@@ -57,12 +69,18 @@ class Plot:
         return text_width
 
     @staticmethod
-    def caption(price, y, screen_width, font, draw, fill=None, currency_offset=-1, price_offset=60):
+    def caption(price, y, screen_width, font, draw, fill=None, currency_offset=-1, price_offset=60, glyphs=None):
         draw.text((currency_offset, y), config.display_ticker, font=font, fill=fill)
         price_text = Plot.human_format(price, 8, 2)
-        text_width = draw.textlength(price_text, font)
+        if glyphs is None:
+            text_width = draw.textlength(price_text, font)
+        else:
+            text_width = glyphs.textlength(price_text)
         price_position = (((screen_width - text_width - price_offset) / 2) + price_offset, y)
-        draw.text(price_position, price_text, font=font, fill=fill)
+        if glyphs is None:
+            draw.text(price_position, price_text, font=font, fill=fill)
+        else:
+            glyphs.text(draw, price_position, price_text, fill=fill)
 
     @staticmethod
     def candle(data, size=(100, 100), position=(0, 0), draw=None, fill_neg="#000000", fill_pos=None):
@@ -2,6 +2,7 @@ import json
 import time
 import requests
 import urllib.parse
+from operator import itemgetter
 from datetime import datetime, time as dt_time, timezone, timedelta
 from zoneinfo import ZoneInfo
 from urllib.error import HTTPError, URLError
@@ -15,6 +16,8 @@ DATETIME_FORMAT = "%Y-%m-%dT%H:%M"
 MARKET_TIMEZONE = ZoneInfo("America/New_York")
 MARKET_OPEN_TIME = dt_time(9, 30)
 MARKET_CLOSE_TIME = dt_time(16, 0)
+# Coinbase candles are [time, low, high, open, close, volume]
+_CANDLE_OHLC = itemgetter(slice(1, 5))
 
 
 def get_dummy_data():
@@ -85,7 +88,7 @@ def fetch_prices():
     if not external_data:
         return [], market_closed
 
-    prices = [entry[1:5] for entry in external_data[::-1]]
+    prices = [_CANDLE_OHLC(entry) for entry in reversed(external_data)]
     return prices, market_closed
 
 
@@ -7,7 +7,7 @@ except ImportError:
     pass
 from data.plot import Plot
 from presentation.observer import Observer
-from presentation.screens.screen_utils import draw_market_status, parse_screen_payload
+from presentation.screens.screen_utils import draw_market_status, pack_panel_frame, parse_screen_payload
 
 SCREEN_HEIGHT = 104
 SCREEN_WIDTH = 212
@@ -51,11 +51,9 @@ class Epd2in13bv3(Observer):
     def update(self, data):
         prices, market_closed = parse_screen_payload(data)
         self.form_image(prices, market_closed)
-        image_black_rotated = self.image_black.rotate(180)
-        image_ry_rotated = self.image_ry.rotate(180)
         self.epd.display(
-            self.epd.getbuffer(image_black_rotated),
-            self.epd.getbuffer(image_ry_rotated)
+            pack_panel_frame(self.image_black),
+            pack_panel_frame(self.image_ry)
         )
 
     def close(self):
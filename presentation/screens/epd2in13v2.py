@@ -7,7 +7,8 @@ except ImportError:
     pass
 from data.plot import Plot
 from presentation.observer import Observer
-from presentation.screens.screen_utils import draw_market_status, parse_screen_payload
+from presentation.screens.screen_utils import (GlyphCache, draw_market_status_cached, parse_screen_payload,
+                                              precompute_market_status)
 
 SCREEN_HEIGHT = 122
 SCREEN_WIDTH = 250
@@ -16,6 +17,10 @@ FONT_SMALL = ImageFont.truetype(
     os.path.join(os.path.dirname(__file__), os.pardir, 'Roses.ttf'), 8)
 FONT_LARGE = ImageFont.truetype(
     os.path.join(os.path.dirname(__file__), os.pardir, 'PixelSplitter-Bold.ttf'), 26)
+PRICE_ALPHABET = "0123456789.$,-"
+# Unchanged frames are skipped, but one is pushed with a full refresh after
+# this many in a row to clear partial-update ghosting.
+IDLE_FULL_REFRESH_FRAMES = 8
 
 class Epd2in13v2(Observer):
 
@@ -25,6 +30,17 @@ class Epd2in13v2(Observer):
         self.screen_image = Image.new('1', (SCREEN_WIDTH, SCREEN_HEIGHT), 255)
         self.screen_draw = ImageDraw.Draw(self.screen_image)
         self.mode = mode
+        self._glyph_cache = GlyphCache(FONT_LARGE, PRICE_ALPHABET)
+        self._label_glyph_cache = GlyphCache(FONT_SMALL, PRICE_ALPHABET)
+        self._idle_frames = 0
+        x, y, self._market_status_stroke_fill = precompute_market_status(
+            self.screen_draw, FONT_SMALL, SCREEN_WIDTH, SCREEN_HEIGHT, fill=0)
+        self._market_status_xy = (x, y)
+        # Packed 1bpp frame in the controller's row layout, reused every update
+        self._row_bytes = (self.epd.width + 7) // 8
+        self._framebuffer = bytearray(self._row_bytes * self.epd.height)
+        # What the panel currently shows; _init_display leaves it cleared white
+        self._panel_frame = bytearray(b'\xff') * len(self._framebuffer)
 
     @staticmethod
     def _init_display():
@@ -34,39 +50,76 @@ class Epd2in13v2(Observer):
         epd.init(epd.PART_UPDATE)
         return epd
 
-    def form_image(self, prices, screen_draw, market_closed=False):
-        screen_draw.rectangle((0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), fill="#ffffff")
+    def form_image(self, prices, market_closed=False):
+        self.screen_image.paste(255, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
         screen_draw = self.screen_draw
         if not prices:
             screen_draw.text((10, 50), "No data", font=FONT_SMALL, fill=0)
             if market_closed:
-                draw_market_status(screen_draw, FONT_SMALL, SCREEN_WIDTH, SCREEN_HEIGHT, fill=0)
+                self._draw_market_status()
             return
+        last_prices = [x[3] for x in prices]
         if self.mode == "candle":
             Plot.candle(prices, size=(SCREEN_WIDTH - 45, 93), position=(41, 0), draw=screen_draw)
+            price_min = min(min(row) for row in prices)
+            price_max = max(max(row) for row in prices)
         else:
-            last_prices = [x[3] for x in prices]
             Plot.line(last_prices, size=(SCREEN_WIDTH - 42, 93), position=(42, 0), draw=screen_draw)
-
-        flatten_prices = [item for sublist in prices for item in sublist]
-        if not flatten_prices:
-            screen_draw.text((10, 50), "No data", font=FONT_SMALL, fill=0)
-            return
-        Plot.y_axis_labels(flatten_prices, FONT_SMALL, (0, 0), (38, 89), draw=screen_draw)
+            # The line only plots closes, so label the axis with their range.
+            price_min = min(last_prices)
+            price_max = max(last_prices)
+        Plot.y_axis_labels_minmax(price_min, price_max, FONT_SMALL, (0, 0), (38, 89), draw=screen_draw,
+                                  glyphs=self._label_glyph_cache)
         screen_draw.line([(10, 98), (240, 98)])
         screen_draw.line([(39, 4), (39, 94)])
         screen_draw.line([(60, 102), (60, 119)])
-        Plot.caption(flatten_prices[len(flatten_prices) - 1], 95, SCREEN_WIDTH, FONT_LARGE, screen_draw)
+        Plot.caption(last_prices[-1], 95, SCREEN_WIDTH, FONT_LARGE, screen_draw, glyphs=self._glyph_cache)
         if market_closed:
-            draw_market_status(screen_draw, FONT_SMALL, SCREEN_WIDTH, SCREEN_HEIGHT, fill=0)
+            self._draw_market_status()
+
+    def _draw_market_status(self):
+        draw_market_status_cached(self.screen_draw, FONT_SMALL, self._market_status_xy, fill=0,
+                                  stroke_fill=self._market_status_stroke_fill)
+
+    def _frame_changed(self, buffer):
+        # A straight compare against the previous frame: no hashing copy, and no
+        # collisions to skip a real change
+        if buffer == self._panel_frame:
+            self._idle_frames += 1
+            return False
+        self._idle_frames = 0
+        return True
+
+    def _full_refresh(self, buffer):
+        self.epd.init(self.epd.FULL_UPDATE)
+        self.epd.display(buffer)
+        self.epd.init(self.epd.PART_UPDATE)
+        # Only once it is on the panel, so a failed refresh is retried in full
+        self._idle_frames = 0
+        self._panel_frame[:] = buffer
+
+    def _pack_frame(self):
+        # epd2in13_V2.getbuffer mirrors the panel's y axis on top of the usual
+        # 90 degree turn, so with our 180 flip the frame it sends is the
+        # image's transverse. Build that in one C pass instead of its per-pixel
+        # loop; the rotated copy is only held for the pack, so it is freed
+        # before the refresh starts.
+        self._framebuffer[:] = self.screen_image.transpose(Image.TRANSVERSE).tobytes()
+        return self._framebuffer
 
     def update(self, data):
         prices, market_closed = parse_screen_payload(data)
-        self.form_image(prices, self.screen_draw, market_closed)
-        screen_image_rotated = self.screen_image.rotate(180)
+        self.form_image(prices, market_closed)
+        buffer = self._pack_frame()
+        if not self._frame_changed(buffer):
+            if self._idle_frames >= IDLE_FULL_REFRESH_FRAMES:
+                self._full_refresh(buffer)
+            return
         # TODO: add a way to switch bewen partial and full update
-        # epd.presentation(epd.getbuffer(screen_image_rotated))
-        self.epd.displayPartial(self.epd.getbuffer(screen_image_rotated))
+        # epd.presentation(buffer)
+        self.epd.displayPartial(buffer)
+        # Only once it is on the panel, so a failed refresh is retried
+        self._panel_frame[:] = buffer
 
     def close(self):
         epd2in13_V2.epdconfig.module_exit()
@@ -1,13 +1,35 @@
-from presentation.screens.epd2in13v2 import Epd2in13v2
-from presentation.screens.screen_utils import parse_screen_payload
+from concurrent.futures import ThreadPoolExecutor
+
+from logs import logger
+from presentation.screens.epd2in13v2 import IDLE_FULL_REFRESH_FRAMES, Epd2in13v2
+from presentation.screens.screen_utils import pack_panel_frame, parse_screen_payload
 
 try:
     from waveshare_epd import epd2in13_V3
 except ImportError:
     pass
 
+# Whole panels' worth of partially refreshed rows before a full refresh
+# clears the accumulated ghosting
+PARTIAL_REFRESH_LIMIT = 10
+
+
+def _log_refresh_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("EPD refresh failed: %s", future.exception())
+
 
 class Epd2in13v3(Epd2in13v2):
+    def __init__(self, observable, mode):
+        super().__init__(observable, mode)
+        # Start with a full refresh so partial updates have a base image
+        self._partial_rows = PARTIAL_REFRESH_LIMIT * self.epd.height
+        # A refresh blocks for seconds, so it runs on a single worker while the
+        # caller goes back to fetching. After init every epd call happens on that
+        # worker, which keeps the driver single-threaded without a lock.
+        self._refresh_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="epd-refresh")
+        self._pending_refresh = None
+
     @staticmethod
     def _init_display():
         epd = epd2in13_V3.EPD()
@@ -16,10 +38,68 @@ class Epd2in13v3(Epd2in13v2):
         return epd
 
     def update(self, data):
+        previous = self._pending_refresh
+        if previous is not None and not previous.done():
+            # The previous frame still owns the framebuffer; drop this one
+            return
         prices, market_closed = parse_screen_payload(data)
-        self.form_image(prices, self.screen_draw, market_closed)
-        screen_image_rotated = self.screen_image.rotate(180)
-        self.epd.display(self.epd.getbuffer(screen_image_rotated))
+        self.form_image(prices, market_closed)
+        self._pending_refresh = self._refresh_pool.submit(self._push_frame, self._pack_frame())
+        # A failure is only logged: the panel frame is left as it was, so the
+        # next update retries the refresh
+        self._pending_refresh.add_done_callback(_log_refresh_failure)
+
+    def _pack_frame(self):
+        # Unlike V2, the V3 driver takes the unmirrored portrait layout
+        self._framebuffer[:] = pack_panel_frame(self.screen_image)
+        return self._framebuffer
+
+    def _dirty_rows(self, buffer):
+        # Height of the band of panel rows that differ from what is displayed
+        if buffer == self._panel_frame:
+            return 0
+        row_bytes = self._row_bytes
+        new = memoryview(buffer)
+        old = memoryview(self._panel_frame)
+        first = 0
+        while new[first:first + row_bytes] == old[first:first + row_bytes]:
+            first += row_bytes
+        last = len(buffer)
+        while new[last - row_bytes:last] == old[last - row_bytes:last]:
+            last -= row_bytes
+        return (last - first) // row_bytes
+
+    def _push_frame(self, buffer):
+        # The driver only refreshes the whole panel, so the dirty band cannot
+        # shrink the transfer. It is used instead to meter ghosting: a frame that
+        # changes a few rows uses up less of the budget than a full redraw.
+        dirty_rows = self._dirty_rows(buffer)
+        if not dirty_rows:
+            self._idle_frames += 1
+            if self._idle_frames >= IDLE_FULL_REFRESH_FRAMES:
+                self._full_refresh(buffer)
+            return
+        self._idle_frames = 0
+        self._partial_rows += dirty_rows
+        if self._partial_rows > PARTIAL_REFRESH_LIMIT * self.epd.height:
+            self._full_refresh(buffer)
+            return
+        self.epd.displayPartial(buffer)
+        # Only once it is on the panel, so a failed refresh is retried
+        self._panel_frame[:] = buffer
+
+    def _full_refresh(self, buffer):
+        # displayPartBaseImage refreshes fully and also seeds the controller's
+        # previous-frame RAM that the following partial refreshes diff against.
+        self.epd.init()
+        self.epd.displayPartBaseImage(buffer)
+        # Only once it is on the panel, so a failed refresh is retried in full
+        self._idle_frames = 0
+        self._partial_rows = 0
+        self._panel_frame[:] = buffer
 
     def close(self):
+        # Let an in-flight refresh finish before the GPIO/SPI lines are released
+        self._refresh_pool.shutdown(wait=True)
+        self._pending_refresh = None
         epd2in13_V3.epdconfig.module_exit()
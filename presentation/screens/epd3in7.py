@@ -7,7 +7,7 @@ except ImportError:
     pass
 from data.plot import Plot
 from presentation.observer import Observer
-from presentation.screens.screen_utils import draw_market_status, parse_screen_payload
+from presentation.screens.screen_utils import draw_market_status, pack_panel_frame, parse_screen_payload
 
 SCREEN_HEIGHT = 280
 SCREEN_WIDTH = 480
@@ -62,8 +62,7 @@ class Epd3in7(Observer):
     def update(self, data):
         prices, market_closed = parse_screen_payload(data)
         self.form_image(prices, self.screen_draw, market_closed)
-        screen_image_rotated = self.screen_image.rotate(180)
-        self.epd.display_1Gray(self.epd.getbuffer(screen_image_rotated))
+        self.epd.display_1Gray(pack_panel_frame(self.screen_image))
 
     def close(self):
         epd3in7.epdconfig.module_exit()
@@ -20,11 +20,13 @@ class Picture(Observer):
         super().__init__(observable=observable)
         self.filename = filename
         self.mode = mode
+        self.screen_image = Image.new('1', (SCREEN_WIDTH, SCREEN_HEIGHT), 255)
+        self.screen_draw = ImageDraw.Draw(self.screen_image)
 
     def update(self, data):
         prices, market_closed = parse_screen_payload(data)
-        image = Image.new('1', (SCREEN_WIDTH, SCREEN_HEIGHT), 255)
-        screen_draw = ImageDraw.Draw(image)
+        self.screen_image.paste(255, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+        screen_draw = self.screen_draw
         if self.mode == "candle":
             Plot.candle(prices, size=(SCREEN_WIDTH - 45, 93), position=(41, 0), draw=screen_draw)
         else:
@@ -39,7 +41,7 @@ class Picture(Observer):
         Plot.caption(flatten_prices[len(flatten_prices) - 1], 95, SCREEN_WIDTH, FONT_LARGE, screen_draw)
         if market_closed:
             draw_market_status(screen_draw, FONT_SMALL, SCREEN_WIDTH, SCREEN_HEIGHT, fill=0)
-        image.save(self.filename)
+        self.screen_image.save(self.filename)
 
     def close(self):
         pass
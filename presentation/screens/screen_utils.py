@@ -1,26 +1,117 @@
+from PIL import Image, ImageDraw
+
 MARKET_STATUS_LABEL = "MARKET CLOSED"
 
+# Measured label sizes; the screens only ever measure module-level fonts, so
+# their id() stays valid for the life of the process.
+_TEXT_SIZE_CACHE = {}
+# Rendered label masks, keyed the same way plus the draw's font mode and stroke
+_MARKET_STATUS_MASKS = {}
+
 
 def parse_screen_payload(data):
     if isinstance(data, dict):
-        prices = data.get("prices") or []
-        market_closed = bool(data.get("market_closed"))
-        return prices, market_closed
+        return data.get("prices") or [], bool(data.get("market_closed"))
     return data or [], False
 
 
+class GlyphCache:
+    # Pre-rendered masks for a fixed alphabet, so text made only of those
+    # characters is blitted instead of laid out by FreeType on every frame.
+    # Layout follows ImageDraw.text on a 1-bit image: pair advances carry the
+    # font's kerning, and each glyph is rasterized once per exact sub-pixel
+    # phase it is drawn at, since FreeType's output depends on that phase.
+    def __init__(self, font, alphabet):
+        self.font = font
+        self._alphabet = frozenset(alphabet)
+        self._masks = {}
+        # Advance of the first character of each pair, kerning included
+        self._pair_advances = {}
+        for first in alphabet:
+            for second in alphabet:
+                advance = font.getlength(first + second) - font.getlength(second)
+                self._pair_advances[first + second] = round(advance * 64)
+
+    def covers(self, text):
+        return self._alphabet.issuperset(text)
+
+    def textlength(self, text):
+        return self.font.getlength(text)
+
+    def _mask(self, char, phase_x, phase_y):
+        key = (char, phase_x, phase_y)
+        if key not in self._masks:
+            pad = self.font.size
+            _left, _top, right, bottom = self.font.getbbox(char)
+            tile = Image.new('L', (2 * pad + max(right, 1), 2 * pad + max(bottom, 1)), 0)
+            tile_draw = ImageDraw.Draw(tile)
+            tile_draw.fontmode = '1'
+            tile_draw.text((pad + phase_x, pad + phase_y), char, font=self.font, fill=255)
+            bbox = tile.getbbox()
+            self._masks[key] = None if bbox is None else (tile.crop(bbox), bbox[0] - pad, bbox[1] - pad)
+        return self._masks[key]
+
+    def text(self, draw, xy, text, fill=None):
+        x, y = xy
+        # Masks are cached per sub-pixel phase, so only blit on the 1/128 px grid
+        # the centred captions and labels land on
+        if (draw.fontmode != '1' or x < 0 or y < 0 or x * 128 % 1 or y * 128 % 1
+                or not self.covers(text)):
+            draw.text(xy, text, font=self.font, fill=fill)
+            return
+        origin_x, origin_y = int(x), int(y)
+        start = x - origin_x
+        phase_y = y - origin_y
+        pen = 0
+        previous = None
+        for char in text:
+            if previous is not None:
+                pen += self._pair_advances[previous + char]
+            previous = char
+            glyph_x = start + pen / 64
+            glyph_origin = int(glyph_x)
+            mask = self._mask(char, glyph_x - glyph_origin, phase_y)
+            if mask is not None:
+                glyph, left, top = mask
+                draw.bitmap((origin_x + glyph_origin + left, origin_y + top), glyph, fill=fill)
+
+
+def pack_panel_frame(image):
+    # Waveshare panels are portrait and these screens mount them upside down.
+    # getbuffer would turn a landscape frame by 90 degrees, pixel by pixel in
+    # Python, on top of our 180, so do both in one transpose and pack the
+    # native orientation in C. The bytes match getbuffer's row layout; for
+    # widths that aren't a multiple of 8 only the unused padding bits differ.
+    return image.transpose(Image.ROTATE_270).tobytes()
+
+
 def _text_size(draw, text, font):
-    bbox = draw.textbbox((0, 0), text, font=font)
-    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+    # textbbox depends on the draw's font mode ('1' vs antialiased) as well
+    key = (id(font), text, draw.fontmode)
+    size = _TEXT_SIZE_CACHE.get(key)
+    if size is None:
+        bbox = draw.textbbox((0, 0), text, font=font)
+        size = _TEXT_SIZE_CACHE[key] = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+    return size
+
+
+# Label y for each position, from (screen_height, text_height, padding); unknown
+# positions fall back to the top
+_MARKET_STATUS_Y = {
+    "top": lambda screen_height, text_height, padding: padding,
+    "bottom": lambda screen_height, text_height, padding: screen_height - text_height - padding,
+}
+_WHITE_FILLS = {1: (255,), 3: (255, 255, 255), 4: (255, 255, 255, 255)}
 
 
 def _stroke_fill_from_fill(fill):
     if isinstance(fill, tuple):
-        return tuple(255 for _ in fill)
+        white = _WHITE_FILLS.get(len(fill))
+        return white if white is not None else (255,) * len(fill)
     return 255
 
 
-def draw_market_status(
+def precompute_market_status(
     draw,
     font,
     screen_width,
@@ -32,20 +123,52 @@ def draw_market_status(
 ):
     text_width, text_height = _text_size(draw, MARKET_STATUS_LABEL, font)
     padding = 2
-    if position == "bottom":
-        x = screen_width - text_width - padding
-        y = screen_height - text_height - padding
-    else:
-        x = screen_width - text_width - padding
-        y = padding
+    x = screen_width - text_width - padding
+    y = _MARKET_STATUS_Y.get(position, _MARKET_STATUS_Y["top"])(screen_height, text_height, padding)
     if stroke_width and stroke_fill is None:
         stroke_fill = _stroke_fill_from_fill(fill)
-        
-    draw.text(
-        (x, y),
-        MARKET_STATUS_LABEL,
-        font=font,
-        fill=fill,
-        stroke_width=stroke_width,
-        stroke_fill=stroke_fill,
-    )
+    return x, y, stroke_fill
+
+
+def _market_status_masks(draw, font, stroke_width):
+    # ImageDraw.text renders a stroked label as the stroke outline in
+    # stroke_fill and then the plain glyphs in fill. Rasterize both masks once
+    # and blit them, instead of going through FreeType on every refresh.
+    key = (id(font), draw.fontmode, stroke_width)
+    masks = _MARKET_STATUS_MASKS.get(key)
+    if masks is None:
+        left, top, right, bottom = draw.textbbox((0, 0), MARKET_STATUS_LABEL, font=font, stroke_width=stroke_width)
+        stroke_mask = Image.new('L', (right - left, bottom - top), 0)
+        text_mask = Image.new('L', stroke_mask.size, 0)
+        for mask, width in ((stroke_mask, stroke_width), (text_mask, 0)):
+            mask_draw = ImageDraw.Draw(mask)
+            mask_draw.fontmode = draw.fontmode
+            mask_draw.text((-left, -top), MARKET_STATUS_LABEL, font=font, fill=255, stroke_width=width)
+        masks = _MARKET_STATUS_MASKS[key] = (left, top, stroke_mask, text_mask)
+    return masks
+
+
+def draw_market_status_cached(draw, font, xy, fill, stroke_width=1, stroke_fill=None):
+    left, top, stroke_mask, text_mask = _market_status_masks(draw, font, stroke_width)
+    origin = (xy[0] + left, xy[1] + top)
+    if stroke_width and stroke_fill is None:
+        draw.bitmap(origin, stroke_mask, fill=fill)
+        return
+    if stroke_width:
+        draw.bitmap(origin, stroke_mask, fill=stroke_fill)
+    draw.bitmap(origin, text_mask, fill=fill)
+
+
+def draw_market_status(
+    draw,
+    font,
+    screen_width,
+    screen_height,
+    fill,
+    position="top",
+    stroke_width=1,
+    stroke_fill=None,
+):
+    x, y, stroke_fill = precompute_market_status(
+        draw, font, screen_width, screen_height, fill, position, stroke_width, stroke_fill)
+    draw_market_status_cached(draw, font, (x, y), fill, stroke_width, stroke_fill)